@@ -1,17 +1,41 @@
 import os
 import json
+import logging
+import io
+import gzip
+import zlib
 import re
+import html
+import unicodedata
+import sqlite3
+import time
+import threading
+import queue
+from collections import OrderedDict, namedtuple
 from urllib.parse import urlencode
 from urllib.request import urlopen, Request
 from urllib.error import URLError, HTTPError
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 
-from flask import Flask, jsonify, render_template
+from flask import Flask, Response, render_template
+
+try:
+    import orjson
+except ImportError:  # orjson が無い環境では標準の json で代用
+    orjson = None
+
+try:
+    import urllib3
+except ImportError:  # urllib3 が無い環境では urlopen で代用
+    urllib3 = None
 
 # ==============================
 # 1. アプリ初期化
 # ==============================
 app = Flask(__name__)
+logger = logging.getLogger("news")
 
 # ==============================
 # 2. RSS設定
@@ -27,17 +51,143 @@ CATEGORY_FEEDS_URLS = {
 }
 
 CATEGORIES = list(CATEGORY_FEEDS_URLS.keys())
+
+# 並列取得のスレッド数上限（ソケットを開きすぎないように固定）
+RSS_FETCH_WORKERS = 4
 DEFAULT_GEMINI_MODEL = "gemini-2.5-flash"
 
 # ==============================
 # 3. タグキャッシュ
 #   ★ title → link に変更
+#   ★ 件数上限 + 有効期限つき（長時間稼働でも肥大化しない）
 # ==============================
-TAGS_CACHE: dict[str, list[str]] = {}
+TAGS_CACHE_MAXSIZE = 2048
+TAGS_CACHE_TTL = 3600  # 秒
+
+
+class TTLCache:
+    """件数上限つき LRU + 有効期限のスレッドセーフなキャッシュ"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value) -> None:
+        self.set(key, value)
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        """ttl を指定するとその秒数で期限切れ（省略時は self.ttl）"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+TAGS_CACHE = TTLCache(maxsize=TAGS_CACHE_MAXSIZE, ttl=TAGS_CACHE_TTL)
+
+# ==============================
+# 3-2. タグの永続化（再起動時に Gemini を呼び直さない）
+# ==============================
+TAGS_DB_PATH = os.environ.get(
+    "TAGS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tags_cache.sqlite3")
+)
+
+_tags_db: sqlite3.Connection | None = None
+_tags_db_lock = threading.Lock()
+
+
+def _get_tags_db() -> sqlite3.Connection:
+    global _tags_db
+    if _tags_db is None:
+        conn = sqlite3.connect(TAGS_DB_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tags("
+            "link TEXT PRIMARY KEY, tags TEXT NOT NULL, created_at INTEGER NOT NULL)"
+        )
+        _tags_db = conn
+    return _tags_db
+
+
+def load_persisted_tags() -> int:
+    """有効期限内のタグを TAGS_CACHE に読み込む（読み込んだ件数を返す）"""
+    cutoff = int(time.time() - TAGS_CACHE_TTL)
+    try:
+        with _tags_db_lock:
+            db = _get_tags_db()
+            with db:
+                db.execute("DELETE FROM tags WHERE created_at <= ?", (cutoff,))
+            rows = db.execute(
+                "SELECT link, tags, created_at FROM tags WHERE created_at > ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (cutoff, TAGS_CACHE_MAXSIZE),
+            ).fetchall()
+    except sqlite3.Error as e:
+        logger.warning("TAGS DB ERROR: %s", e)
+        return 0
+
+    # 古い順に入れて LRU の並びを作成時刻に合わせる
+    now = time.time()
+    for link, tags, created_at in reversed(rows):
+        # 有効期限は作成時刻から数える（再読み込みで延長しない）
+        TAGS_CACHE.set(link, json.loads(tags), ttl=created_at + TAGS_CACHE_TTL - now)
+    return len(rows)
+
+
+def persist_tags(entries: dict[str, list[str]]) -> None:
+    """link → tags をまとめて保存"""
+    if not entries:
+        return
+    now = int(time.time())
+    try:
+        with _tags_db_lock:
+            db = _get_tags_db()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO tags(link, tags, created_at) VALUES (?, ?, ?)",
+                    [
+                        (link, json.dumps(tags, ensure_ascii=False), now)
+                        for link, tags in entries.items()
+                    ],
+                )
+    except sqlite3.Error as e:
+        logger.warning("TAGS DB ERROR: %s", e)
 
 # ==============================
 # 4. 共通ユーティリティ
 # ==============================
+_LEADING_NUM_RE = re.compile(r"^[\d０-９①-⑳]+[\.．、)\s]+")
+_VALID_TAG_RE = re.compile(r"[\d０-９①-⑳\.\．、\(\)\s]+")
+# 先頭がこれ以外ならば正規表現を通す必要がない
+_LEADING_CHARS = frozenset("0123456789０１２３４５６７８９①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳")
+_TRANS_PUNCT = str.maketrans({"、": ","})
+# Gemini の出力行「N: タグ1, タグ2, タグ3」
+_LINE_RE = re.compile(r"^\s*(\d+)\s*[:：.]\s*(.*)$")
+
+
 def get_gemini_api_key():
     return os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
 
@@ -46,7 +196,25 @@ def clean_leading_number(text: str) -> str:
     """先頭の番号・記号を除去"""
     if not text:
         return ""
-    return re.sub(r"^[\d０-９①-⑳]+[\.．、)\s]+", "", text).strip()
+    head = text[0]
+    # 大半のタイトルは番号で始まらないので、ここで早期リターン
+    if head not in _LEADING_CHARS and not head.isdecimal():
+        return text.strip()
+    return _LEADING_NUM_RE.sub("", text).strip()
+
+
+def title_key(title: str) -> str:
+    """カテゴリをまたいで同じ見出しを同一視するためのキャッシュキー"""
+    normalized = unicodedata.normalize("NFKC", title).lower()
+    return "title:" + _LEADING_NUM_RE.sub("", normalized).strip()
+
+
+def lookup_tags(item) -> list[str] | None:
+    """link → 正規化タイトル の順にキャッシュを参照（未生成なら None）"""
+    tags = TAGS_CACHE.get(item.link)
+    if tags:
+        return tags
+    return TAGS_CACHE.get(title_key(item.title), tags)
 
 
 def is_valid_tag(tag: str) -> bool:
@@ -54,100 +222,531 @@ def is_valid_tag(tag: str) -> bool:
     if not tag:
         return False
     # 数字・記号だけは除外
-    if re.fullmatch(r"[\d０-９①-⑳\.\．、\(\)\s]+", tag):
+    if _VALID_TAG_RE.fullmatch(tag):
         return False
     return True
 
+# ==============================
+# 4-2. HTTP（接続の再利用）
+#   ★ urllib3 があれば接続プールで TCP/TLS 接続を使い回す
+# ==============================
+HttpResponse = namedtuple("HttpResponse", "status headers data")
+
+HTTP_RETRIES = 2
+HTTP_BACKOFF_FACTOR = 0.2
+
+_HTTP = (
+    urllib3.PoolManager(
+        num_pools=4,
+        maxsize=8,
+        retries=urllib3.Retry(total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR),
+    )
+    if urllib3 is not None
+    else None
+)
+
+
+def http_request(method: str, url: str, headers: dict | None = None,
+                 body: bytes | None = None, timeout: float = 10) -> HttpResponse:
+    """HTTPリクエストを送信（4xx/5xx も例外にせず status で返す。通信エラーは URLError）"""
+    # 圧縮転送を要求（XML/JSON は数分の1になる）
+    headers = {"Accept-Encoding": "gzip, deflate", **(headers or {})}
+    if _HTTP is not None:
+        # urllib3 は Content-Encoding に応じて自動で展開する
+        try:
+            resp = _HTTP.request(method, url, headers=headers, body=body, timeout=timeout)
+        except urllib3.exceptions.HTTPError as e:
+            raise URLError(e) from e
+        return HttpResponse(resp.status, resp.headers, resp.data)
+
+    req = Request(url, data=body, headers=headers, method=method)
+    try:
+        with urlopen(req, timeout=timeout) as resp:
+            status, resp_headers, data = resp.status, resp.headers, resp.read()
+    except HTTPError as e:
+        status, resp_headers, data = e.code, e.headers, e.read()
+    return HttpResponse(status, resp_headers, _decode_body(data, resp_headers))
+
+
+def _decode_body(data: bytes, headers) -> bytes:
+    """Content-Encoding に応じて本文を展開（urlopen は自動展開しないため）"""
+    encoding = (headers.get("Content-Encoding") or "").strip().lower()
+    if not data or encoding in ("", "identity"):
+        return data
+    try:
+        if encoding == "gzip":
+            return gzip.decompress(data)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(data)
+            except zlib.error:
+                # zlib ヘッダなしの raw deflate を返すサーバもある
+                return zlib.decompress(data, -zlib.MAX_WBITS)
+    except (OSError, EOFError, zlib.error) as e:
+        raise URLError(f"invalid {encoding} body: {e}") from e
+    return data
+
 # ==============================
 # 5. RSS取得
 # ==============================
+# RSSの1記事（dict より省メモリで、属性アクセスも速い）
+Item = namedtuple("Item", "title summary link published")
+
+# Google News RSS は <item> 直下に title / link / description が並ぶだけの単純な構造なので、
+# 正規表現で直接取り出す（XML パーサでツリーを組み立てるより速い）
+_ITEM_RE = re.compile(rb"<item\b[^>]*>(.*?)</item>", re.DOTALL)
+_FIELD_RES = {
+    name: re.compile(rb"<" + name.encode() + rb"\b[^>]*>(.*?)</" + name.encode() + rb">", re.DOTALL)
+    for name in ("title", "link", "description", "pubDate")
+}
+_CDATA_RE = re.compile(r"^\s*<!\[CDATA\[(.*)\]\]>\s*$", re.DOTALL)
+
+
+def _field_text(block: bytes, name: str) -> str:
+    m = _FIELD_RES[name].search(block)
+    if not m:
+        return ""
+    text = m.group(1).decode("utf-8", errors="replace")
+    cdata = _CDATA_RE.match(text)
+    if cdata:
+        return cdata.group(1)
+    return html.unescape(text)
+
+
+def _make_item(title: str, summary: str, link: str, published: str) -> Item | None:
+    title = clean_leading_number(title)
+    summary = clean_leading_number(summary)
+    if not (title and link):
+        return None
+    return Item(title.strip(), summary.strip(), link.strip(), published.strip())
+
+
+def _parse_items_regex(data: bytes, max_items: int) -> list[Item]:
+    items = []
+    for m in _ITEM_RE.finditer(data):
+        block = m.group(1)
+        item = _make_item(
+            _field_text(block, "title"),
+            _field_text(block, "description"),
+            _field_text(block, "link"),
+            _field_text(block, "pubDate"),
+        )
+        if item:
+            items.append(item)
+            if len(items) >= max_items:
+                break
+    return items
+
+
+def _parse_items_xml(data: bytes, max_items: int) -> list[Item]:
+    # 全体のツリーを作らず、item を読み終えた時点で逐次処理して max_items で打ち切る
+    items = []
+    for _, elem in ET.iterparse(io.BytesIO(data), events=("end",)):
+        if elem.tag != "item":
+            continue
+        item = _make_item(
+            elem.findtext("title") or "",
+            elem.findtext("description") or "",
+            elem.findtext("link") or "",
+            elem.findtext("pubDate") or "",
+        )
+        elem.clear()
+
+        if item:
+            items.append(item)
+            if len(items) >= max_items:
+                break
+    return items
+
+
+def parse_rss_items(data: bytes, max_items: int = 20) -> list[Item]:
+    """RSS本文から item を取り出す（想定外の形式なら XML パーサで処理）"""
+    items = _parse_items_regex(data, max_items)
+    if items:
+        return items
+    try:
+        return _parse_items_xml(data, max_items)
+    except ET.ParseError as e:
+        # 同意ページなど RSS 以外の本文が 200 で返ることがある
+        logger.warning("RSS ERROR: %s", e)
+        return []
+
+
+# url → (etag, last_modified, items, 取得時刻)
+FEED_CACHE: dict[str, tuple[str, str, list[Item], float]] = {}
+FEED_CACHE_LOCK = threading.Lock()
+FEED_CACHE_MIN_AGE = 120  # 秒。この間は再取得せずキャッシュを返す
+
+
 def fetch_rss_items(feed_url: str, max_items: int = 20):
+    with FEED_CACHE_LOCK:
+        cached = FEED_CACHE.get(feed_url)
+    if cached and time.monotonic() - cached[3] < FEED_CACHE_MIN_AGE:
+        return cached[2][:max_items]
+
+    headers = {"User-Agent": "Mozilla/5.0"}
+    if cached:
+        # 条件付きGET：更新がなければ 304 が返り本文の転送・パースを省ける
+        if cached[0]:
+            headers["If-None-Match"] = cached[0]
+        if cached[1]:
+            headers["If-Modified-Since"] = cached[1]
+
     try:
-        req = Request(feed_url, headers={"User-Agent": "Mozilla/5.0"})
-        with urlopen(req, timeout=10) as resp:
-            data = resp.read()
-    except (URLError, HTTPError) as e:
-        print("RSS ERROR:", e)
+        resp = http_request("GET", feed_url, headers=headers, timeout=10)
+    except URLError as e:
+        logger.warning("RSS ERROR: %s", e)
         return []
 
-    root = ET.fromstring(data)
-    channel = root.find("channel")
-    if channel is None:
+    if resp.status == 304 and cached:
+        with FEED_CACHE_LOCK:
+            FEED_CACHE[feed_url] = (*cached[:3], time.monotonic())
+        return cached[2][:max_items]
+    if resp.status != 200:
+        logger.warning("RSS ERROR: HTTP %s %s", resp.status, feed_url)
         return []
 
-    items = []
-    for item in channel.findall("item")[:max_items]:
-        title = clean_leading_number(item.findtext("title") or "")
-        summary = clean_leading_number(item.findtext("description") or "")
-        link = item.findtext("link") or ""
-
-        if title and link:
-            items.append({
-                "title": title.strip(),
-                "summary": summary.strip(),
-                "link": link.strip(),
-            })
+    etag = resp.headers.get("ETag", "")
+    last_modified = resp.headers.get("Last-Modified", "")
+    items = parse_rss_items(resp.data, max_items)
+    if not items:
+        # 壊れた本文を条件付きGETの基準にしない
+        return []
+
+    with FEED_CACHE_LOCK:
+        FEED_CACHE[feed_url] = (etag, last_modified, items, time.monotonic())
     return items
 
+
+def fetch_many(urls: list[str], workers: int = RSS_FETCH_WORKERS,
+               fetch=None) -> list[list]:
+    """複数フィードを並列取得（結果は urls と同じ順序）"""
+    if not urls:
+        return []
+    fetch = fetch or fetch_rss_items
+    # HTTP 接続は共有の PoolManager（スレッドセーフ）から取得する（urllib3 が無ければ呼び出しごとに接続）
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as executor:
+        return list(executor.map(fetch, urls))
+
 # ==============================
 # 6. Gemini タグ生成
-#   ★ キャッシュキーは link
+#   ★ キャッシュキーは link と正規化タイトル（title_key）
 # ==============================
-def generate_tags_for_items(items: list[dict]) -> None:
-    uncached = [it for it in items if it["link"] not in TAGS_CACHE]
+GEMINI_TIMEOUT = 30  # 秒（接続・読み込みそれぞれに適用される）
+
+TAG_BATCH_WINDOW = 0.05  # 秒。この間に届いたタイトルを1回の呼び出しにまとめる
+TAG_BATCH_MAX = 30
+TAG_BATCH_WORKERS = 4  # 同時に実行する Gemini 呼び出しの上限
+# 呼び出し側が待つのは Gemini 1回分まで。間に合わなければタグなしで返し、
+# 結果は TAGS_CACHE に入るので次回の定期更新で反映される
+TAG_WAIT_TIMEOUT = GEMINI_TIMEOUT + TAG_BATCH_WINDOW + 1
+
+
+def generate_tags_for_items(items: list[Item]) -> None:
+    # 他カテゴリで同じ見出しのタグを生成済みなら Gemini は呼ばない
+    uncached = [it for it in items if lookup_tags(it) is None]
     if not uncached:
         return
 
-    api_key = get_gemini_api_key()
-    if not api_key:
+    if not get_gemini_api_key():
         for it in uncached:
-            TAGS_CACHE[it["link"]] = []
+            TAGS_CACHE[it.link] = []
         return
 
-    titles = [it["title"] for it in uncached]
-    model = os.environ.get("GEMINI_MODEL", DEFAULT_GEMINI_MODEL)
+    TAG_QUEUE.submit(uncached)
+
+
+class TagRequestQueue:
+    """複数リクエストのタイトルを短い待ち時間でまとめて Gemini に渡す"""
+
+    def __init__(self, handler, window: float = TAG_BATCH_WINDOW,
+                 max_batch: int = TAG_BATCH_MAX):
+        self.handler = handler
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue()
+        # 正規化タイトル → (完了通知, 同じ見出しを待っている記事)
+        self._pending: dict[str, tuple[threading.Event, list[Item]]] = {}
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        # バッチごとにスレッドを作らず、上限つきのプールで実行する
+        self._executor = ThreadPoolExecutor(
+            max_workers=TAG_BATCH_WORKERS, thread_name_prefix="tag-batch"
+        )
+
+    def submit(self, items: list[Item], timeout: float = TAG_WAIT_TIMEOUT) -> None:
+        """items のタグが TAGS_CACHE に入るまで待つ"""
+        events = []
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="tag-batcher", daemon=True
+                )
+                self._worker.start()
+            for it in items:
+                # 同じ見出し（他カテゴリの記事を含む）が処理待ちなら相乗りする
+                key = title_key(it.title)
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = (threading.Event(), [it])
+                    self._queue.put(it)
+                elif all(w.link != it.link for w in pending[1]):
+                    pending[1].append(it)
+                events.append(pending[0])
+
+        deadline = time.monotonic() + timeout
+        for event in events:
+            if not event.wait(max(0.0, deadline - time.monotonic())):
+                break
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Gemini の待ち時間中も次のバッチを受け付けられるよう別スレッドで実行
+            self._executor.submit(self._process, batch)
+
+    def _process(self, batch: list[Item]) -> None:
+        try:
+            self.handler(batch)
+        except Exception as e:
+            logger.warning("GEMINI ERROR: %s", e)
+        finally:
+            with self._lock:
+                done = [self._pending.pop(title_key(it.title), None) for it in batch]
+            shared = {}
+            for pending in filter(None, done):
+                event, waiters = pending
+                # 生成結果を相乗りしていた全記事の link にも反映
+                tags = TAGS_CACHE.get(title_key(waiters[0].title))
+                if tags is not None:
+                    for it in waiters[1:]:
+                        TAGS_CACHE[it.link] = tags
+                        shared[it.link] = tags
+                event.set()
+            persist_tags(shared)
 
-    url = (
+
+GEMINI_TITLE_MAX_CHARS = 80  # タグ付けには十分な長さ。超過分は入力トークン削減のため切り捨て
+
+
+_PROMPT_PREFIX = (
+    "以下の番号付きニュースタイトルそれぞれについて、日本語タグを最大3個生成してください。\n"
+    "各行を「番号: タグ1, タグ2, タグ3」の形式で、タイトルと同じ番号を付けて出力してください。\n"
+    "タグには番号や記号を一切含めないでください。\n\n"
+)
+# 1件だけなら番号付けの説明を省いた短いプロンプトにする
+_SINGLE_PROMPT_PREFIX = (
+    "次のニュースタイトルの日本語タグを最大3個、番号や記号を含めずカンマ区切りで出力してください。\n\n"
+)
+
+
+def build_tag_prompt(titles: list[str]) -> str:
+    """タグ生成用プロンプトを作成"""
+    titles = [t[:GEMINI_TITLE_MAX_CHARS] for t in titles]
+    if len(titles) == 1:
+        return _SINGLE_PROMPT_PREFIX + titles[0]
+    return _PROMPT_PREFIX + "\n".join(f"{i}: {t}" for i, t in enumerate(titles, 1))
+
+
+@lru_cache(maxsize=1)
+def _gemini_url(model: str, api_key: str) -> str:
+    """モデルとキーは起動後ほぼ変わらないので URL は一度だけ組み立てる"""
+    return (
         "https://generativelanguage.googleapis.com/v1beta/"
         f"models/{model}:generateContent?{urlencode({'key': api_key})}"
     )
 
-    prompt = (
-        "以下のニュースタイトルそれぞれについて、日本語タグを最大3個生成してください。\n"
-        "番号や記号は一切含めず、カンマ区切りのタグのみを出力してください。\n\n"
-        + "\n".join(titles)
-    )
 
+def request_tags(uncached: list[Item]) -> None:
+    """Gemini を1回呼び出して uncached のタグを TAGS_CACHE に格納"""
+    api_key = get_gemini_api_key()
+    if not api_key:
+        for it in uncached:
+            TAGS_CACHE[it.link] = []
+        return
+
+    model = os.environ.get("GEMINI_MODEL", DEFAULT_GEMINI_MODEL)
+    url = _gemini_url(model, api_key)
+
+    prompt = build_tag_prompt([it.title for it in uncached])
     payload = {"contents": [{"parts": [{"text": prompt}]}]}
-    req = Request(
-        url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={"Content-Type": "application/json"},
-    )
 
     try:
-        with urlopen(req, timeout=30) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
+        resp = http_request(
+            "POST",
+            url,
+            headers={"Content-Type": "application/json"},
+            body=json.dumps(payload).encode("utf-8"),
+            timeout=GEMINI_TIMEOUT,
+        )
+        if resp.status != 200:
+            raise URLError(f"HTTP {resp.status}")
+        data = json.loads(resp.data.decode("utf-8"))
         text = data["candidates"][0]["content"]["parts"][0]["text"]
     except Exception as e:
-        print("GEMINI ERROR:", e)
+        logger.warning("GEMINI ERROR: %s", e)
         for it in uncached:
-            TAGS_CACHE[it["link"]] = []
+            TAGS_CACHE[it.link] = []
         return
 
+    generated = {}
+    for idx, line in parse_tag_lines(text, len(uncached)).items():
+        item = uncached[idx]
+        tags = parse_tags(line)
+        TAGS_CACHE[item.link] = tags
+        TAGS_CACHE[title_key(item.title)] = tags
+        generated[item.link] = tags
+
+    # エラー時の空タグは保存せず、Gemini の結果だけを永続化
+    persist_tags(generated)
+
+
+def parse_tags(tags_part: str, limit: int = 3) -> list[str]:
+    """カンマ区切りのタグ部分から有効なタグを最大 limit 個取り出す"""
+    tags = []
+    for t in tags_part.translate(_TRANS_PUNCT).split(","):
+        t = clean_leading_number(t.strip())
+        if is_valid_tag(t):
+            tags.append(t)
+            # 必要数が揃ったら残りは見ない
+            if len(tags) == limit:
+                break
+    return tags
+
+
+def parse_tag_lines(text: str, count: int) -> dict[int, str]:
+    """Gemini の出力を タイトル番号(0始まり) → タグ部分 に対応付け"""
     lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
 
-    for item, line in zip(uncached, lines):
-        raw_tags = [
-            clean_leading_number(t.strip())
-            for t in line.replace("、", ",").split(",")
-        ]
-        tags = [t for t in raw_tags if is_valid_tag(t)]
-        TAGS_CACHE[item["link"]] = tags[:3]
+    parsed = {}
+    for line in lines:
+        m = _LINE_RE.match(line)
+        if not m:
+            continue
+        idx = int(m.group(1)) - 1
+        if 0 <= idx < count and idx not in parsed:
+            parsed[idx] = m.group(2)
+    if parsed:
+        return parsed
+
+    # 番号付きの行が1つもない場合のみ、従来どおり行の順番で対応付け
+    return dict(enumerate(lines[:count]))
+
+
+TAG_QUEUE = TagRequestQueue(request_tags)
+
+# ==============================
+# 7. バックグラウンド更新
+#   ★ RSS取得 + タグ生成をリクエスト処理から切り離す
+# ==============================
+NEWS_REFRESH_INTERVAL = 180  # 秒
+
+# category → レスポンス用ニュース一覧（取得失敗は [] として記録）
+NEWS_CACHE: dict[str, list[dict]] = {}
+NEWS_CACHE_LOCK = threading.RLock()
+
+_CATEGORY_BY_URL = {url: c for c, url in CATEGORY_FEEDS_URLS.items()}
+# 同じフィードを複数スレッドが同時に取得しないためのロック
+_FEED_LOCKS = {url: threading.Lock() for url in CATEGORY_FEEDS_URLS.values()}
+
+_refresher_started = False
+
+
+def build_news(items: list[Item]) -> list[dict]:
+    """レスポンス用にタグを付与"""
+    return [{**it._asdict(), "tags": lookup_tags(it) or []} for it in items]
+
+
+def fetch_and_tag(feed_url: str) -> list[Item]:
+    """RSS取得 → タグ生成 を1フィード分まとめて実行（失敗時は空リスト）"""
+    try:
+        target = fetch_rss_items(feed_url)[:10]
+        generate_tags_for_items(target)
+    except Exception as e:
+        # 1カテゴリの失敗で他カテゴリの更新を止めない
+        logger.exception("RSS ERROR: %s %s", feed_url, e)
+        return []
+    return target
+
+
+def refresh_feed(feed_url: str, only_if_missing: bool = False) -> list[dict]:
+    """1フィードを取得して NEWS_CACHE を更新し、その内容を返す"""
+    category = _CATEGORY_BY_URL[feed_url]
+    with _FEED_LOCKS[feed_url]:
+        if only_if_missing:
+            # 待っている間に他のスレッドが取得済みならそれを使う
+            with NEWS_CACHE_LOCK:
+                news = NEWS_CACHE.get(category)
+            if news is not None:
+                return news
+
+        target = fetch_and_tag(feed_url)
+        with NEWS_CACHE_LOCK:
+            if target:
+                NEWS_CACHE[category] = build_news(target)
+            else:
+                # 失敗時は前回の内容を残す。初回の失敗も [] として記録し、
+                # リクエストのたびに再取得しない（次回の定期更新で取り直す）
+                NEWS_CACHE.setdefault(category, [])
+            return NEWS_CACHE[category]
+
+
+def refresh_all_categories() -> None:
+    """全カテゴリを並列に取得し NEWS_CACHE を更新"""
+    # RSS取得と Gemini 呼び出しをカテゴリ単位で並列化し、外部I/Oの待ち時間を重ねる
+    fetch_many([CATEGORY_FEEDS_URLS[c] for c in CATEGORIES], fetch=refresh_feed)
+
+
+def _refresh_loop() -> None:
+    while True:
+        try:
+            refresh_all_categories()
+        except Exception as e:
+            logger.exception("REFRESH ERROR: %s", e)
+        time.sleep(NEWS_REFRESH_INTERVAL)
+
+
+def start_refresher() -> None:
+    """保存済みタグを読み込み、更新スレッドを1度だけ起動"""
+    global _refresher_started
+    with NEWS_CACHE_LOCK:
+        if _refresher_started:
+            return
+        _refresher_started = True
+    load_persisted_tags()
+    threading.Thread(target=_refresh_loop, name="news-refresher", daemon=True).start()
+
+
+def get_category_news(category: str) -> list[dict]:
+    """キャッシュ済みのニュースを返す（未取得ならその場で1度だけ取得）"""
+    start_refresher()
+    with NEWS_CACHE_LOCK:
+        news = NEWS_CACHE.get(category)
+    if news is not None:
+        return news
+    return refresh_feed(CATEGORY_FEEDS_URLS[category], only_if_missing=True)
 
 # ==============================
-# 7. ルーティング
+# 8. ルーティング
 # ==============================
+def json_response(obj, status: int = 200) -> Response:
+    """JSONレスポンスを作成（orjson があれば使用）"""
+    if orjson is not None:
+        body = orjson.dumps(obj)
+    else:
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    return Response(body, status=status, mimetype="application/json")
+
+
 @app.route("/")
 def index():
     return render_template("index.html", categories=CATEGORIES)
@@ -155,32 +754,36 @@ def index():
 
 @app.route("/api/news/<category>")
 def get_news(category):
-    feed_url = CATEGORY_FEEDS_URLS.get(category)
-    if not feed_url:
-        return jsonify({"error": "invalid category"}), 404
+    if category not in CATEGORY_FEEDS_URLS:
+        return json_response({"error": "invalid category"}, 404)
 
-    items = fetch_rss_items(feed_url)
-    if not items:
-        return jsonify({"error": "no news"}), 500
+    news = get_category_news(category)
+    if not news:
+        return json_response({"error": "no news"}, 500)
+
+    return json_response({"news": news})
+
+
+@app.route("/api/news/all")
+def get_all_news():
+    start_refresher()
+    with NEWS_CACHE_LOCK:
+        missing = [CATEGORY_FEEDS_URLS[c] for c in CATEGORIES if c not in NEWS_CACHE]
+    if missing:
+        fetch_many(missing, fetch=partial(refresh_feed, only_if_missing=True))
 
-    target = items[:10]
-    generate_tags_for_items(target)
+    with NEWS_CACHE_LOCK:
+        result = {c: NEWS_CACHE.get(c, []) for c in CATEGORIES}
 
-    return jsonify({
-        "news": [
-            {
-                "title": it["title"],
-                "summary": it["summary"],
-                "link": it["link"],
-                "tags": TAGS_CACHE.get(it["link"], [])
-            }
-            for it in target
-        ]
-    })
+    if not any(result.values()):
+        return json_response({"error": "no news"}, 500)
+    return json_response({"news": result})
 
 # ==============================
-# 8. 起動
+# 9. 起動
 # ==============================
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     TAGS_CACHE.clear()
+    start_refresher()
     app.run(host="0.0.0.0", port=5000, debug=False)
@@ -0,0 +1,11 @@
+# gunicorn 設定（`gunicorn app:app` で自動的に読み込まれる）
+#   Gemini / RSS の待ち時間が大半を占めるため、プロセスよりも安価なスレッドで並列化する
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = "gthread"
+# ワーカーごとに更新スレッドとタグキャッシュを持つため、複数プロセスにすると
+# RSS 取得と Gemini 呼び出しが重複する。1プロセスでスレッドを増やす
+workers = 1
+threads = 32
+timeout = 60